@@ -1,35 +1,1261 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import cv2
-from PIL import Image, ImageTk
+import time
+STARTED_AT = time.monotonic()  # before the other imports, so startup metrics include them
+try:
+    import tkinter as tk
+    from tkinter import ttk, scrolledtext, messagebox
+    from PIL import ImageTk
+except ImportError:  # headless installs have no Tk; only BookDiscussionApp needs it
+    tk = ttk = scrolledtext = messagebox = ImageTk = None
+from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
 import threading
+import queue
 import os
-import time
-from transformers import BlipProcessor, BlipForConditionalGeneration
+import re
+import math
+import random
+import importlib
+from collections import deque, Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from collections import namedtuple
+import gc
+import io
+import json
+import base64
+import sqlite3
+import numpy as np
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+SCENE_MODEL_NAME = "Salesforce/blip-image-captioning-base"
+SCENE_IDLE_TIMEOUT = float(os.getenv('SCENE_IDLE_TIMEOUT', '0'))  # seconds, 0 keeps the model resident
+SCENE_NUM_THREADS = int(os.getenv('SCENE_NUM_THREADS', '0'))      # 0 leaves torch's default
+FRAME_JPEG_QUALITY = int(os.getenv('FRAME_JPEG_QUALITY', '90'))
+FRAME_MAX_SIDE = int(os.getenv('FRAME_MAX_SIDE', '1600'))          # px, 0 keeps full resolution
+OCR_MIN_CONFIDENCE = float(os.getenv('OCR_MIN_CONFIDENCE', '0.6'))  # below this the remote model is asked
+OCR_TARGET_WIDTH = int(os.getenv('OCR_TARGET_WIDTH', '1800'))      # ~6in of page at 300 DPI
+OCR_DPI = 300
+HF_OCR_MODEL = "Qwen/Qwen2.5-VL-3B-Instruct"
+HF_INFERENCE_URL = os.getenv('HF_INFERENCE_URL', "https://api-inference.huggingface.co/models")
+RESULT_CACHE_PATH = os.getenv('RESULT_CACHE_PATH', os.path.join(os.path.expanduser('~'), '.readingbuddy', 'cache.sqlite3'))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '2000'))
+RESULT_CACHE_MAX_DISTANCE = int(os.getenv('RESULT_CACHE_MAX_DISTANCE', '24'))  # of 255 hash bits a "same page" may differ by
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '60'))
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+HTTP_BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', '1'))     # seconds, doubled per retry
+HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', '30'))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '4'))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
+CAMERA_INDEX = int(os.getenv('CAMERA_INDEX', '0'))
+CAMERA_BUFFER_SIZE = int(os.getenv('CAMERA_BUFFER_SIZE', '3'))       # ring slots; older frames are overwritten
+CAMERA_PREVIEW_FPS = float(os.getenv('CAMERA_PREVIEW_FPS', '30'))
+PREVIEW_SIZE = (500, 400)
+AUTO_CAPTURE_STABLE_FRAMES = int(os.getenv('AUTO_CAPTURE_STABLE_FRAMES', '8'))
+AUTO_CAPTURE_MAX_MOTION = float(os.getenv('AUTO_CAPTURE_MAX_MOTION', '4'))      # mean abs grey-level change between frames
+AUTO_CAPTURE_MIN_SHARPNESS = float(os.getenv('AUTO_CAPTURE_MIN_SHARPNESS', '80'))  # Laplacian variance
+TRACE_FILE = os.getenv('TRACE_FILE', '')                              # JSONL span export, empty disables it
+TRACE_WINDOW = int(os.getenv('TRACE_WINDOW', '500'))                   # samples per stage kept for p50/p95
+STARTUP_LAZY_IMPORTS = os.getenv('STARTUP_LAZY_IMPORTS', '1') != '0'   # 0 imports cv2/torch/transformers before the window
+STARTUP_WARM_MODELS = os.getenv('STARTUP_WARM_MODELS', '0') == '1'     # also load BLIP weights on the API key screen
+STARTUP_WARM_CAMERA = os.getenv('STARTUP_WARM_CAMERA', '0') == '1'     # open the camera on the API key screen
+JOB_LIMITS = {'ocr': 1, 'scene': 1, 'chat': 1, 'summary': 1, 'index': 1, 'warmup': 1}  # worker threads per job kind
+BRIDGE_POLL_MS = 15                                                      # how often Tk drains worker callbacks
+CHAT_STREAMING = os.getenv('CHAT_STREAMING', '1') != '0'
+STREAM_FLUSH_MS = int(os.getenv('STREAM_FLUSH_MS', '50'))          # coalesce streamed tokens into one UI update per interval
+GROQ_CHAT_URL = os.getenv('GROQ_CHAT_URL', "https://api.groq.com/openai/v1/chat/completions")
+GROQ_CHAT_MODEL = "llama-3.1-8b-instant"
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '3000'))  # prompt tokens sent per turn
+CONTEXT_RECENT_TURNS = int(os.getenv('CONTEXT_RECENT_TURNS', '6'))     # messages always kept verbatim
+CONTEXT_SUMMARY_BATCH = int(os.getenv('CONTEXT_SUMMARY_BATCH', '4'))   # older messages folded into the summary at once
+CONTEXT_TEXT_SHARE = 0.6                                                # of the budget the book text may use
+CHUNK_WORDS = int(os.getenv('CHUNK_WORDS', '120'))
+CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', '30'))
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', '4'))
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', '')                     # e.g. all-MiniLM-L6-v2, empty disables vectors
+EMBEDDING_WEIGHT = 0.5                                                  # share of the hybrid score taken by cosine similarity
+SYSTEM_PROMPT = "You are a thoughtful book discussion companion. Help users explore and understand captured text."
+
+
+class Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.name, time.monotonic() - self.start, **self.attrs)
+
+
+class Tracer:
+    """Monotonic timings per pipeline stage with rolling percentiles and optional JSONL export"""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, path=TRACE_FILE, window=TRACE_WINDOW):
+        self.path = path
+        self.window = window
+        self._samples = {}   # stage -> deque of seconds
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def record(self, name, seconds, **attrs):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            if self.path:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+                self._file.write(json.dumps({'ts': time.time(), 'span': name, 'ms': round(seconds * 1000, 2),
+                                             'thread': threading.current_thread().name, **attrs}) + "\n")
+
+    def stats(self):
+        with self._lock:
+            return {name: {'count': self._counts[name], 'last': samples[-1],
+                           'p50': percentile(samples, 50), 'p95': percentile(samples, 95)}
+                    for name, samples in self._samples.items()}
+
+    def summary(self):
+        lines = [f"{'stage':<20}{'p50':>9}{'p95':>9}{'n':>6}"]
+        for name, s in sorted(self.stats().items()):
+            lines.append(f"{name:<20}{s['p50'] * 1000:>7.0f}ms{s['p95'] * 1000:>7.0f}ms{s['count']:>6}")
+        return "\n".join(lines)
+
+
+def trace(name, **attrs):
+    """Context manager timing one pipeline stage: `with trace('ocr.local'): ...`"""
+    return Tracer.instance().span(name, **attrs)
+
+
+class LazyModule:
+    """Stands in for a heavy module and imports it on first attribute access, timed as `import.<name>`"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with trace(f'import.{self._name}'):
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.ensure_loaded(), attr)
+
+
+cv2 = LazyModule('cv2')
+torch = LazyModule('torch')
+transformers = LazyModule('transformers')
+
+
+def warm_start(models=STARTUP_WARM_MODELS):
+    """Pay for the heavy imports (and optionally the BLIP weights) up front; returns seconds since launch"""
+    with trace('startup.warm'):
+        cv2.ensure_loaded()
+        try:
+            torch.ensure_loaded()
+            with trace('import.blip'):
+                transformers.BlipProcessor, transformers.BlipForConditionalGeneration  # resolves the lazy submodules
+        except ImportError as e:
+            print(f"⚠️ Scene descriptions unavailable: {e}")
+        else:
+            if models:
+                SceneModelManager.instance().acquire()
+    ready = time.monotonic() - STARTED_AT
+    Tracer.instance().record('startup.ready', ready)
+    return ready
+
+
+class EncodedFrame:
+    """A captured BGR frame JPEG-encoded once in memory and shared by OCR, captioning and caching"""
+    def __init__(self, image, quality=FRAME_JPEG_QUALITY, max_side=FRAME_MAX_SIDE):
+        h, w = image.shape[:2]
+        if max_side > 0 and max(h, w) > max_side:
+            scale = max_side / max(h, w)
+            image = cv2.resize(image, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Could not encode captured frame")
+        self.image = image
+        self.jpeg = buf.tobytes()
+        self._base64 = None
+        self._phash = None
+
+    @classmethod
+    def from_jpeg(cls, jpeg):
+        """Wrap bytes that were already encoded, e.g. handed over from another process"""
+        frame = cls.__new__(cls)
+        frame.image = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        frame.jpeg = jpeg
+        frame._base64 = frame._phash = None
+        return frame
+
+    @property
+    def base64(self):
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.jpeg).decode("utf-8")
+        return self._base64
+
+    @property
+    def phash(self):
+        """255-bit DCT perceptual hash, stable across sensor noise, lighting and small shifts of the same page"""
+        if self._phash is None:
+            small = cv2.resize(cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY), (128, 128), interpolation=cv2.INTER_AREA)
+            low = cv2.dct(small.astype(np.float32))[:16, :16].ravel()[1:]  # lowest frequencies, without the DC term
+            self._phash = np.packbits(low > np.median(low)).tobytes().hex()
+        return self._phash
+
+    def to_pil(self):
+        return Image.open(io.BytesIO(self.jpeg)).convert('RGB')
 
 
 class SceneDescriber:
-    def __init__(self, model_name="Salesforce/blip-image-captioning-base"):
+    def __init__(self, model_name=SCENE_MODEL_NAME, num_threads=SCENE_NUM_THREADS):
         try:
             print("🔄 Loading scene description model...")
-            self.processor = BlipProcessor.from_pretrained(model_name)
-            self.model = BlipForConditionalGeneration.from_pretrained(model_name)
+            if num_threads > 0:
+                torch.set_num_threads(num_threads)
+            self.processor = transformers.BlipProcessor.from_pretrained(model_name)
+            self.model = transformers.BlipForConditionalGeneration.from_pretrained(model_name)
+            self.model.eval()
             print("✅ Scene description loaded!")
         except Exception as e:
             print(f"❌ Failed to load scene model: {e}")
             self.processor = self.model = None
 
-    def describe_scene(self, image_path):
-        if not self.processor or not self.model:
-            return "Scene description model not available"
-        try:
-            image = Image.open(image_path).convert('RGB')
-            inputs = self.processor(image, return_tensors="pt")
-            outputs = self.model.generate(**inputs)
+    def caption(self, frame):
+        with trace('caption.infer'):
+            inputs = self.processor(frame.to_pil(), return_tensors="pt")
+            with torch.inference_mode():
+                outputs = self.model.generate(**inputs)
             return self.processor.decode(outputs[0], skip_special_tokens=True)
+
+
+class SceneModelManager:
+    """Process-wide owner of the BLIP model: loads once, keeps it warm, evicts when idle"""
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, model_name=SCENE_MODEL_NAME, idle_timeout=SCENE_IDLE_TIMEOUT, num_threads=SCENE_NUM_THREADS):
+        self.model_name = model_name
+        self.idle_timeout = idle_timeout
+        self.num_threads = num_threads
+        self._describer = None
+        self._lock = threading.Lock()
+        self._last_used = 0.0
+        self._evict_timer = None
+
+    @property
+    def is_loaded(self):
+        return self._describer is not None
+
+    def acquire(self):
+        with self._lock:
+            if self._describer is None:
+                with trace('caption.load', model=self.model_name):
+                    describer = SceneDescriber(self.model_name, self.num_threads)
+                if describer.model is None:
+                    return describer  # don't cache a failed load, the next call retries
+                self._describer = describer
+            self._touch()
+            return self._describer
+
+    @property
+    def model_id(self):
+        return f"blip:{self.model_name}"
+
+    def caption(self, frame):
+        """Caption a frame with the shared model, raising when it could not be loaded"""
+        describer = self.acquire()
+        if describer.model is None:
+            raise RuntimeError("Scene description model not available")
+        try:
+            return describer.caption(frame)
+        finally:
+            with self._lock:
+                self._touch()
+
+    def _touch(self):
+        self._last_used = time.monotonic()
+        if self.idle_timeout > 0:
+            if self._evict_timer:
+                self._evict_timer.cancel()
+            self._evict_timer = threading.Timer(self.idle_timeout, self._evict_if_idle)
+            self._evict_timer.daemon = True
+            self._evict_timer.start()
+
+    def _evict_if_idle(self):
+        with self._lock:
+            if self._describer is not None and time.monotonic() - self._last_used >= self.idle_timeout:
+                print("💤 Scene model idle, unloading")
+                self._drop()
+
+    def _drop(self):
+        if self._evict_timer:
+            self._evict_timer.cancel()
+            self._evict_timer = None
+        self._describer = None
+        gc.collect()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class HttpClient:
+    """Keep-alive session pool per host with timeouts, jittered retries and a circuit breaker"""
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT, max_retries=HTTP_MAX_RETRIES,
+                 backoff_base=HTTP_BACKOFF_BASE, backoff_max=HTTP_BACKOFF_MAX, pool_size=HTTP_POOL_SIZE,
+                 failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sessions = {}
+        self._circuits = {}   # host -> [consecutive failures, opened at]
+        self._metrics = {}    # host -> {'requests', 'errors', 'latencies'}
+        self._lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method, url, timeout=None, max_retries=None, cancel=None, **kwargs):
+        """cancel is an optional threading.Event; once set, no further attempt or backoff wait is made"""
+        host = urlsplit(url).netloc
+        self._check_circuit(host)
+        session = self._session(host)
+        retries = self.max_retries if max_retries is None else max_retries
+        for attempt in range(retries + 1):
+            if cancel is not None and cancel.is_set():
+                raise RequestCancelled(f"request to {host} cancelled")
+            start = time.monotonic()
+            try:
+                resp = session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(host, time.monotonic() - start, ok=False)
+                if attempt == retries:
+                    self._trip(host)
+                    raise
+                delay = self._backoff(attempt)
+                print(f"  {type(e).__name__} from {host}, retrying in {delay:.1f}s")
+            else:
+                retryable = resp.status_code in self.RETRY_STATUSES
+                self._record(host, time.monotonic() - start, ok=not retryable)
+                if not retryable:
+                    self._reset(host)
+                    return resp
+                if attempt == retries:
+                    self._trip(host)
+                    return resp
+                delay = self._backoff(attempt, self._retry_after(resp))
+                print(f"  HTTP {resp.status_code} from {host}, retrying in {delay:.1f}s")
+                resp.close()
+            with trace('http.backoff', host=host):
+                if cancel is None:
+                    time.sleep(delay)
+                elif cancel.wait(delay):
+                    raise RequestCancelled(f"request to {host} cancelled")
+
+    def stats(self):
+        """Per-host request counts and latency percentiles in seconds"""
+        with self._lock:
+            return {host: {'requests': m['requests'], 'errors': m['errors'],
+                           'p50': percentile(m['latencies'], 50), 'p95': percentile(m['latencies'], 95)}
+                    for host, m in self._metrics.items()}
+
+    def _session(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+            return session
+
+    @staticmethod
+    def _retry_after(resp):
+        """Retry-After, or the `estimated_time` Hugging Face sends in the body of a "model loading" 503"""
+        retry_after = resp.headers.get('Retry-After')
+        if retry_after or resp.status_code != 503:
+            return retry_after
+        try:
+            return str(float(resp.json()['estimated_time']))
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if retry_after:
+            try:
+                wait = float(retry_after)
+            except ValueError:
+                try:
+                    wait = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    wait = 0
+            delay = max(delay, min(wait, self.backoff_max))
+        return delay
+
+    def _record(self, host, latency, ok):
+        Tracer.instance().record('http.attempt', latency, host=host, ok=ok)
+        with self._lock:
+            m = self._metrics.setdefault(host, {'requests': 0, 'errors': 0, 'latencies': deque(maxlen=200)})
+            m['requests'] += 1
+            m['errors'] += 0 if ok else 1
+            m['latencies'].append(latency)
+
+    def _check_circuit(self, host):
+        with self._lock:
+            failures, opened_at = self._circuits.get(host, (0, None))
+            if opened_at is not None:
+                remaining = self.reset_timeout - (time.monotonic() - opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"{host} is unavailable, retrying in {remaining:.0f}s")
+                self._circuits[host] = [failures, None]  # half-open: let this request probe the host
+
+    def _trip(self, host):
+        with self._lock:
+            circuit = self._circuits.setdefault(host, [0, None])
+            circuit[0] += 1
+            if circuit[0] >= self.failure_threshold:
+                circuit[1] = time.monotonic()
+                print(f"🔌 Circuit open for {host} after {circuit[0]} failures")
+
+    def _reset(self, host):
+        with self._lock:
+            self._circuits.pop(host, None)
+
+
+def stream_chat(payload, headers=None, cancel=None, on_start=None, on_chunk=None, flush_ms=STREAM_FLUSH_MS):
+    """Stream a Groq completion over SSE, passing text to on_chunk at most once per flush_ms; returns all of it"""
+    cancel = cancel or threading.Event()
+    tracer, start = Tracer.instance(), time.monotonic()
+    with trace('llm.request', stream=True):
+        response = HttpClient.instance().post(GROQ_CHAT_URL, headers=headers, json=dict(payload, stream=True), stream=True,
+                                              cancel=cancel)
+    with response:
+        response.raise_for_status()
+        response.encoding = 'utf-8'  # text/event-stream has no charset, requests would assume latin-1
+        if on_start:
+            on_start()
+        parts, pending, last_flush = [], [], time.monotonic()
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if cancel.is_set():
+                break
+            if not line or not line.startswith('data:'):
+                continue
+            data = line[5:].strip()
+            if data == '[DONE]':
+                break
+            token = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if token:
+                if not parts and not pending:
+                    tracer.record('llm.first_token', time.monotonic() - start)
+                pending.append(token)
+            if pending and time.monotonic() - last_flush >= flush_ms / 1000:
+                parts.append("".join(pending))
+                pending.clear()
+                if on_chunk:
+                    on_chunk(parts[-1])
+                last_flush = time.monotonic()
+        if pending:
+            parts.append("".join(pending))
+            if on_chunk:
+                on_chunk(parts[-1])
+    tracer.record('llm.complete', time.monotonic() - start, stream=True, cancelled=cancel.is_set())
+    return "".join(parts)
+
+
+class CameraStream:
+    """Reads the camera on its own thread into a preallocated ring buffer, keeping only the newest frames"""
+
+    def __init__(self, device=CAMERA_INDEX, buffer_size=CAMERA_BUFFER_SIZE):
+        self.device = device
+        self.buffer_size = max(2, buffer_size)
+        self.seq = 0              # number of frames published, the newest lives at (seq - 1) % buffer_size
+        self.on_frame = None      # optional callback(frame) run on the capture thread after each publish
+        self._capture = None
+        self._ring = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._capture = cv2.VideoCapture(self.device)
+        if not self._capture.isOpened():
+            self._capture.release()
+            return False
+        ok, first = self._capture.read()
+        if not ok:
+            self._capture.release()
+            return False
+        self._ring = np.empty((self.buffer_size,) + first.shape, dtype=first.dtype)
+        self._ring[0] = first
+        self.seq = 1
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(self._capture,), daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Ask the reader thread to finish; it releases the capture itself once its last read returns"""
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = self._capture = None
+
+    def _run(self, capture):
+        try:
+            while self._running:
+                slot = self.seq % self.buffer_size
+                target = self._ring[slot]
+                ok, frame = capture.read(target)
+                if not ok:
+                    time.sleep(0.01)
+                    continue
+                with self._lock:
+                    if frame.shape != target.shape:  # camera changed resolution, reallocate
+                        self._ring = np.empty((self.buffer_size,) + frame.shape, dtype=frame.dtype)
+                        self._ring[slot] = frame
+                    elif not np.may_share_memory(frame, target):
+                        np.copyto(target, frame)
+                    self.seq += 1
+                    frame = self._ring[slot]
+                # The slot is only rewritten by this thread, so the callback can read it without the lock
+                if self.on_frame:
+                    self.on_frame(frame)
+        finally:
+            capture.release()  # only here, so a read still in progress never sees a released capture
+
+    def latest(self):
+        """Copy of the newest full-resolution frame, or None before the first frame"""
+        with self._lock:
+            if not self.seq:
+                return None
+            return self._ring[(self.seq - 1) % self.buffer_size].copy()
+
+    def render(self, dst):
+        """Resize the newest frame into dst without allocating; returns its sequence number"""
+        with self._lock:
+            if not self.seq:
+                return None
+            cv2.resize(self._ring[(self.seq - 1) % self.buffer_size], (dst.shape[1], dst.shape[0]),
+                       dst=dst, interpolation=cv2.INTER_AREA)
+            return self.seq
+
+
+def order_quad(points):
+    """Order four corners as top-left, top-right, bottom-right, bottom-left"""
+    points = points.reshape(4, 2).astype(np.float32)
+    sums, diffs = points.sum(axis=1), np.diff(points, axis=1).ravel()
+    return np.array([points[np.argmin(sums)], points[np.argmin(diffs)],
+                     points[np.argmax(sums)], points[np.argmax(diffs)]], dtype=np.float32)
+
+
+def find_page_quad(gray, min_area=0.2):
+    """Largest four-sided contour covering at least min_area of the image, or None"""
+    edges = cv2.dilate(cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150), None)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area * gray.shape[0] * gray.shape[1]:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            return order_quad(approx)
+    return None
+
+
+def warp_page(image, quad):
+    tl, tr, br, bl = quad
+    width = int(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl)))
+    height = int(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr)))
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    return cv2.warpPerspective(image, cv2.getPerspectiveTransform(quad, target), (width, height))
+
+
+class AutoCapture:
+    """Scores frames for sharpness and stillness and hands back the best one once the page settles"""
+
+    def __init__(self, stable_frames=AUTO_CAPTURE_STABLE_FRAMES, max_motion=AUTO_CAPTURE_MAX_MOTION,
+                 min_sharpness=AUTO_CAPTURE_MIN_SHARPNESS, analysis_width=320):
+        self.stable_frames = stable_frames
+        self.max_motion = max_motion
+        self.min_sharpness = min_sharpness
+        self.analysis_width = analysis_width
+        self.reset()
+
+    def reset(self):
+        self._previous = None
+        self._still = 0
+        self._best = None
+        self._best_sharpness = -1.0
+        self._best_gray = None
+
+    def feed(self, frame):
+        """Returns a perspective-corrected page when ready, otherwise None"""
+        h, w = frame.shape[:2]
+        scale = self.analysis_width / w
+        gray = cv2.cvtColor(cv2.resize(frame, (self.analysis_width, int(h * scale)), interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+        motion = float(cv2.absdiff(gray, self._previous).mean()) if self._previous is not None else float('inf')
+        self._previous = gray
+        if motion > self.max_motion:
+            self._still, self._best, self._best_sharpness = 0, None, -1.0
+            return None
+        
+        self._still += 1
+        sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+        if sharpness > self._best_sharpness:
+            self._best, self._best_sharpness, self._best_gray = frame.copy(), sharpness, gray
+        if self._still < self.stable_frames or self._best_sharpness < self.min_sharpness:
+            return None
+        
+        best, sharpness, quad = self._best, self._best_sharpness, find_page_quad(self._best_gray)
+        self.reset()
+        print(f"🤖 Auto-capture: sharpness {sharpness:.0f}, page {'found' if quad is not None else 'not found'}")
+        return warp_page(best, quad / scale) if quad is not None else best
+
+
+class Job:
+    """Handle given to a background task: its kind, generation id and cancellation flag"""
+
+    def __init__(self, scheduler, kind, generation):
+        self.scheduler = scheduler
+        self.kind = kind
+        self.generation = generation
+        self.cancelled = threading.Event()
+
+    @property
+    def is_current(self):
+        return not self.cancelled.is_set() and self.scheduler.generation(self.kind) == self.generation
+
+    def post(self, fn, *args):
+        """Run fn on the Tk thread, unless this job was cancelled or superseded by then"""
+        self.scheduler.call_soon(self._deliver, fn, args)
+
+    def _deliver(self, fn, args):
+        if self.is_current:
+            fn(*args)
+
+
+class JobScheduler:
+    """Bounded worker threads per job kind beside Tk, with superseding and a single queue back to the UI"""
+
+    def __init__(self, root, limits=JOB_LIMITS, poll_ms=BRIDGE_POLL_MS):
+        self.root = root
+        self.limits = limits
+        self.poll_ms = poll_ms
+        self._queues = {}        # kind -> queue of (job, fn, args)
+        self._live = {}          # kind -> jobs queued or running
+        self._running = {}       # kind -> jobs a thread is executing right now
+        self._generations = {}   # kind -> current generation id
+        self._lock = threading.Lock()
+        self._inbox = queue.SimpleQueue()
+        self._poll()
+
+    def generation(self, kind):
+        return self._generations.get(kind, 0)
+
+    def submit(self, kind, fn, *args, supersede=True):
+        """Queue fn(job, *args); with supersede, earlier jobs of the same kind are cancelled"""
+        with self._lock:
+            if supersede:
+                self._cancel_locked(kind)
+            job = Job(self, kind, self.generation(kind))
+            self._live.setdefault(kind, set()).add(job)
+            jobs = self._queues.get(kind)
+            if jobs is None:
+                jobs = self._queues[kind] = queue.Queue()
+                for i in range(self.limits.get(kind, 1)):
+                    threading.Thread(target=self._worker, args=(kind, jobs), name=f"{kind}-{i}", daemon=True).start()
+            # Every worker may still be unwinding a cancelled job (a request mid-flight); don't queue behind it
+            spare = supersede and len(self._running.get(kind, ())) >= self.limits.get(kind, 1)
+        jobs.put((job, fn, args))
+        if spare:
+            threading.Thread(target=self._spare, args=(kind, jobs), name=f"{kind}-spare", daemon=True).start()
+        return job
+
+    def cancel(self, *kinds):
+        """Cancel queued and running jobs of the given kinds (all kinds when none are given)"""
+        with self._lock:
+            for kind in kinds or list(self._live):
+                self._cancel_locked(kind)
+
+    def call_soon(self, fn, *args):
+        """Thread-safe: run fn(*args) on the Tk thread at the next poll"""
+        self._inbox.put((fn, args))
+
+    def _cancel_locked(self, kind):
+        self._generations[kind] = self.generation(kind) + 1
+        for job in self._live.pop(kind, ()):
+            job.cancelled.set()
+
+    def _worker(self, kind, jobs):
+        while True:
+            self._run(kind, *jobs.get())
+
+    def _spare(self, kind, jobs):
+        """Temporary extra worker for a superseding job; exits once the queue is empty"""
+        while True:
+            try:
+                item = jobs.get_nowait()
+            except queue.Empty:
+                return
+            self._run(kind, *item)
+
+    def _run(self, kind, job, fn, args):
+        with self._lock:
+            self._running.setdefault(kind, set()).add(job)
+        try:
+            if not job.cancelled.is_set():
+                fn(job, *args)
+        except RequestCancelled:
+            pass
         except Exception as e:
-            return f"Unable to describe scene: {e}"
+            print(f"❌ {kind} job failed: {e}")
+        finally:
+            with self._lock:
+                self._live.get(kind, set()).discard(job)
+                self._running[kind].discard(job)
+
+    def _poll(self):
+        # Schedule first: a callback may open a modal dialog, whose nested event loop keeps polling meanwhile
+        self.root.after(self.poll_ms, self._poll)
+        while True:
+            try:
+                fn, args = self._inbox.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"❌ UI callback failed: {e}")
+
+
+CachedResult = namedtuple('CachedResult', 'text caption confidence created last_used source')  # source: engine that read the text
+
+
+class ResultCache:
+    """SQLite store of OCR text and captions keyed by perceptual frame hash and engine identity"""
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_entries=RESULT_CACHE_MAX_ENTRIES, max_distance=RESULT_CACHE_MAX_DISTANCE):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS results (
+            phash TEXT NOT NULL, engine TEXT NOT NULL, text TEXT, caption TEXT, confidence REAL,
+            created REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (phash, engine))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        if 'source' not in {row[1] for row in self._db.execute("PRAGMA table_info(results)")}:
+            self._db.execute("ALTER TABLE results ADD COLUMN source TEXT")
+        self._db.commit()
+
+    def get(self, phash, engine):
+        with self._lock:
+            row = self._db.execute("SELECT phash, text, caption, confidence, created, last_used, source FROM results "
+                                   "WHERE phash = ? AND engine = ?", (phash, engine)).fetchone()
+            if row is None and self.max_distance > 0:
+                row = self._nearest(phash, engine)
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            self._db.execute("UPDATE results SET last_used = ? WHERE phash = ? AND engine = ?", (now, row[0], engine))
+            self._db.commit()
+            return CachedResult(row[1], row[2], row[3], row[4], now, row[6])
+
+    def put(self, phash, engine, text=None, caption=None, confidence=None, source=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute("""INSERT INTO results (phash, engine, text, caption, confidence, created, last_used, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (phash, engine) DO UPDATE SET
+                text = excluded.text, caption = excluded.caption, confidence = excluded.confidence,
+                last_used = excluded.last_used, source = excluded.source""",
+                (phash, engine, text, caption, confidence, now, now, source))
+            self._db.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM results "
+                             "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size}
+
+    def _nearest(self, phash, engine):
+        target = int(phash, 16)
+        best, best_distance = None, self.max_distance + 1
+        for row in self._db.execute("SELECT phash, text, caption, confidence, created, last_used, source FROM results "
+                                    "WHERE engine = ? AND length(phash) = ?", (engine, len(phash))):
+            distance = bin(target ^ int(row[0], 16)).count('1')
+            if distance < best_distance:
+                best, best_distance = row, distance
+        return best
+
+
+OcrResult = namedtuple('OcrResult', 'text confidence engine error', defaults=(None,))  # error: engine failed, not a blank page
+
+
+class OcrEngine:
+    """Base OCR backend: turns an EncodedFrame into an OcrResult with confidence in [0, 1]"""
+    name = "ocr"
+
+    def recognize(self, frame, cancel=None):
+        raise NotImplementedError
+
+    def _empty(self, error=None):
+        return OcrResult("", 0.0, self.name, error)
+
+
+class TesseractOcrEngine(OcrEngine):
+    """Offline OCR through the local Tesseract binary"""
+    name = "tesseract"
+
+    def __init__(self, lang='eng', target_width=OCR_TARGET_WIDTH, dpi=OCR_DPI):
+        self.lang = lang
+        self.target_width = target_width
+        self.dpi = dpi
+        self._available = None
+
+    @property
+    def available(self):
+        if self._available is None:
+            try:
+                self._available = pytesseract is not None and bool(pytesseract.get_tesseract_version())
+            except Exception:
+                self._available = False
+        return self._available
+
+    def preprocess(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        scale = self.target_width / gray.shape[1]
+        if scale > 1.15 or scale < 0.75:  # skip resampling when already near the target size
+            interp = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interp)
+        binary = cv2.adaptiveThreshold(cv2.medianBlur(gray, 3), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY, 31, 15)
+        return self._deskew(binary)
+
+    def _deskew(self, binary, max_angle=15):
+        coords = cv2.findNonZero(255 - binary)
+        if coords is None:
+            return binary
+        angle = cv2.minAreaRect(coords)[-1]
+        if angle > 45:
+            angle -= 90
+        elif angle < -45:
+            angle += 90
+        if abs(angle) < 0.5 or abs(angle) > max_angle:
+            return binary
+        h, w = binary.shape
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        return cv2.warpAffine(binary, matrix, (w, h), flags=cv2.INTER_CUBIC,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+
+    def recognize(self, frame, cancel=None):
+        if not self.available:
+            print("⚠️ Tesseract not available, skipping local OCR")
+            return self._empty("Tesseract not available")
+        try:
+            with trace('ocr.local'):
+                data = pytesseract.image_to_data(self.preprocess(frame.image), lang=self.lang,
+                                                 config=f'--psm 3 --dpi {self.dpi}',
+                                                 output_type=pytesseract.Output.DICT)
+            lines, confs = {}, []
+            for i, word in enumerate(data['text']):
+                conf = float(data['conf'][i])
+                if conf < 0 or not word.strip():
+                    continue
+                key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+                lines.setdefault(key, []).append(word)
+                confs.append(conf)
+            text = "\n".join(" ".join(words) for words in lines.values())
+            confidence = sum(confs) / len(confs) / 100 if confs else 0.0
+            print(f"🔤 Tesseract: {len(text)} chars, confidence {confidence:.2f}")
+            return OcrResult(text, confidence, self.name)
+        except Exception as e:
+            print(f"❌ Tesseract failed: {e}")
+            return self._empty(f"Tesseract failed: {e}")
+
+
+class RemoteVlOcrEngine(OcrEngine):
+    """OCR through the Hugging Face hosted vision-language model"""
+
+    def __init__(self, model=HF_OCR_MODEL, attempts=3):
+        self.model = model
+        self.attempts = attempts
+        self.name = f"hf:{model}"
+
+    def recognize(self, frame, cancel=None):
+        hf_api_key = os.getenv('HF_API_KEY', '')
+        
+        if not hf_api_key:
+            print("❌ HF_API_KEY not found")
+            return self._empty("HF_API_KEY not set")
+        
+        print("🔄 Calling Hugging Face Vision API...")
+        
+        # Use the Inference API with chat completion format for VL models
+        api_url = f"{HF_INFERENCE_URL}/{self.model}"
+        headers = {
+            "Authorization": f"Bearer {hf_api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "inputs": {
+                "image": frame.base64,
+                "text": "Extract and return all the text you can read from this image. Only output the extracted text, nothing else."
+            }
+        }
+        
+        # Retries (model loading 503s, rate limits) are handled by the shared client
+        try:
+            with trace('ocr.remote', model=self.model):
+                resp = HttpClient.instance().post(api_url, headers=headers, json=payload, max_retries=self.attempts - 1,
+                                                  cancel=cancel)
+            
+            print(f"  Response status: {resp.status_code}")
+            print(f"  Response: {resp.text[:500]}")
+            
+            if resp.status_code == 200:
+                result = resp.json()
+                # Parse response based on format
+                if isinstance(result, list) and len(result) > 0:
+                    text = result[0].get("generated_text", "") or result[0].get("text", "")
+                elif isinstance(result, dict):
+                    text = result.get("generated_text", "") or result.get("text", "") or result.get("output", "")
+                else:
+                    text = str(result)
+                
+                if text.strip():
+                    print(f"✅ Success: {len(text)} chars extracted")
+                    return OcrResult(text.strip(), 1.0, self.name)  # the VL model reports no score
+                else:
+                    print("  No text in response")
+                    return self._empty()
+            print(f"  Error: {resp.text[:200]}")
+            return self._empty(f"Hugging Face returned HTTP {resp.status_code}")
+                
+        except RequestCancelled:
+            return self._empty("cancelled")
+        except requests.exceptions.Timeout:
+            print("  Timeout calling Hugging Face")
+            return self._empty("Timeout calling Hugging Face")
+        except Exception as e:
+            print(f"  Error: {e}")
+            return self._empty(str(e))
+
+
+class LocalFirstOcrEngine(OcrEngine):
+    """Reads with the local engine and only asks the remote one when confidence is low"""
+
+    def __init__(self, local=None, remote=None, min_confidence=OCR_MIN_CONFIDENCE):
+        self.local = local or TesseractOcrEngine()
+        self.remote = remote or RemoteVlOcrEngine()
+        self.min_confidence = min_confidence
+        self.name = f"{self.local.name}>{self.remote.name}"
+
+    def recognize(self, frame, cancel=None):
+        result = self.local.recognize(frame)
+        if result.text.strip() and result.confidence >= self.min_confidence:
+            return result
+        print(f"🔁 Local OCR confidence {result.confidence:.2f} below {self.min_confidence}, trying remote")
+        remote = self.remote.recognize(frame, cancel)
+        return remote if remote.text.strip() else result
+
+
+def recognize_frame(engine, cache, frame, cancel=None, min_confidence=OCR_MIN_CONFIDENCE):
+    """OCR through the result cache; only confident readings are stored, so a weak fallback is read again next time"""
+    cached = cache.get(frame.phash, engine.name)
+    if cached and cached.text and (cached.confidence or 0) >= min_confidence:
+        print(f"⚡ OCR cache hit ({cache.stats()})")
+        return OcrResult(cached.text, cached.confidence, cached.source or engine.name)
+    with trace('ocr.total', engine=engine.name):
+        result = engine.recognize(frame, cancel)
+    if result.text.strip() and result.confidence >= min_confidence:
+        cache.put(frame.phash, engine.name, text=result.text, confidence=result.confidence, source=result.engine)
+    return result
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 chars per token for English), good enough for budgeting"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def truncate_to_tokens(text, max_tokens):
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, max_tokens * 4 - 3)] + "..."
+
+
+class ContextBuilder:
+    """Fits the book text, a rolling summary and recent turns into a fixed prompt budget"""
+
+    def __init__(self, summarizer=None, budget=CONTEXT_TOKEN_BUDGET, recent_turns=CONTEXT_RECENT_TURNS,
+                 summary_batch=CONTEXT_SUMMARY_BATCH, system_prompt=SYSTEM_PROMPT):
+        self.summarizer = summarizer
+        self.budget = budget
+        self.recent_turns = recent_turns
+        self.summary_batch = summary_batch
+        self.system_prompt = system_prompt
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.summary = ""
+            self.summarized_count = 0
+            self._epoch = getattr(self, '_epoch', 0) + 1
+
+    @staticmethod
+    def dialogue(history):
+        """Only real conversation turns, without OCR previews, hints and error notices"""
+        return [{"role": m["role"], "content": m["content"]} for m in history if not m.get("chrome")]
+
+    def build(self, text, history, user_msg):
+        turns = self.dialogue(history)
+        remaining = self.budget - estimate_tokens(self.system_prompt) - estimate_tokens(user_msg) - 20
+        text = truncate_to_tokens(text or "", int(max(0, remaining) * CONTEXT_TEXT_SHARE))
+        remaining -= estimate_tokens(text)
+        
+        with self._lock:
+            summary, summarized = self.summary, self.summarized_count
+        if summary and estimate_tokens(summary) <= remaining:
+            remaining -= estimate_tokens(summary)
+        else:
+            summary, summarized = "", 0
+        
+        # Every turn the summary doesn't cover yet goes in verbatim, newest first, while the budget lasts;
+        # that includes older turns still waiting for compact() to fold them in
+        recent = []
+        for turn in reversed(turns[summarized:]):
+            cost = estimate_tokens(turn["content"]) + 4
+            if cost > remaining:
+                break
+            recent.insert(0, turn)
+            remaining -= cost
+        
+        opening = f"Text from book:\n\n{text}\n\n"
+        if summary:
+            opening += f"Summary of our discussion so far:\n{summary}\n\n"
+        return [{"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": opening + "Let's discuss."}] + recent + [{"role": "user", "content": user_msg}]
+
+    def compact(self, history):
+        """Fold turns that left the recent window into the running summary, a batch at a time"""
+        if not self.summarizer:
+            return
+        with self._lock:
+            turns = self.dialogue(history)
+            older = turns[:max(0, len(turns) - self.recent_turns)]
+            pending = older[self.summarized_count:]
+            if len(pending) < self.summary_batch:
+                return
+            epoch, done, summary = self._epoch, self.summarized_count, self.summary
+        try:
+            summary = self.summarizer(summary, pending)
+        except Exception as e:
+            return print(f"⚠️ Could not summarise discussion: {e}")
+        with self._lock:
+            # Drop the result if the discussion was reset or another compaction got there first
+            if self._epoch == epoch and self.summarized_count == done:
+                self.summary, self.summarized_count = summary, len(older)
+
+
+Chunk = namedtuple('Chunk', 'id page text')
+
+STOPWORDS = frozenset("a an and are as at be by for from has have he her his i in is it its of on or she that the "
+                      "their they this to was were what when which who will with you your".split())
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9']+", text.lower()) if t not in STOPWORDS]
+
+
+def load_embedder(model_name=EMBEDDING_MODEL):
+    """Optional CPU sentence embedder; returns None when disabled or sentence-transformers is missing"""
+    if not model_name:
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name, device='cpu')
+        return lambda texts: model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+    except Exception as e:
+        print(f"⚠️ Embeddings disabled: {e}")
+        return None
+
+
+class BookIndex:
+    """All pages captured for the current book, chunked and indexed with BM25 (plus optional vectors)"""
+
+    def __init__(self, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP, embedder=None, k1=1.5, b=0.75):
+        self.chunk_words = chunk_words
+        self.overlap = overlap
+        self.embedder = embedder
+        self.k1, self.b = k1, b
+        self._lock = threading.Lock()
+        self.epoch = -1
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1         # an add_page begun before the clear must not write into the new book
+            self.pages = []
+            self.chunks = []
+            self.postings = {}      # term -> {chunk id: term frequency}
+            self.lengths = []
+            self.vectors = None     # (chunks, dim) float32, rows L2-normalised
+            self._seen = set()
+
+    def __len__(self):
+        return len(self.pages)
+
+    def attach_embedder(self, embedder):
+        """Switch on vectors after construction; refused once chunks exist, as they would lack one"""
+        with self._lock:
+            if self.chunks:
+                return False
+            self.embedder = embedder
+            return True
+
+    def add_page(self, text, epoch=None):
+        """Index a captured page; returns its page number, or None if it was already stored or the book was cleared"""
+        text = text.strip()
+        with self._lock:
+            epoch = self.epoch if epoch is None else epoch
+            if not text or text in self._seen or epoch != self.epoch:
+                return None
+            self._seen.add(text)
+            self.pages.append(text)
+            page = len(self.pages)
+            new_chunks = [Chunk(len(self.chunks) + i, page, body) for i, body in enumerate(self._split(text))]
+            for chunk in new_chunks:
+                terms = tokenize(chunk.text)
+                self.lengths.append(len(terms))
+                for term, tf in Counter(terms).items():
+                    self.postings.setdefault(term, {})[chunk.id] = tf
+            self.chunks.extend(new_chunks)
+        if self.embedder:
+            vectors = self.embedder([c.text for c in new_chunks])
+            with self._lock:
+                if epoch != self.epoch:
+                    return None
+                self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+        return page
+
+    def search(self, query, k=RETRIEVAL_TOP_K):
+        with self._lock:
+            if not self.chunks:
+                return []
+            scores = np.zeros(len(self.chunks), dtype=np.float32)
+            avg_len = sum(self.lengths) / len(self.lengths) or 1
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (len(self.chunks) - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / avg_len)
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            vectors = self.vectors
+        if scores.max() > 0:
+            scores /= scores.max()
+        if vectors is not None and len(vectors) == len(scores):
+            similarity = vectors @ self.embedder([query])[0]
+            scores = (1 - EMBEDDING_WEIGHT) * scores + EMBEDDING_WEIGHT * np.clip(similarity, 0, None)
+        top = np.argsort(-scores)[:k]
+        return [self.chunks[i] for i in sorted(top) if scores[i] > 0]
+
+    def latest_page_chunks(self, k=RETRIEVAL_TOP_K):
+        with self._lock:
+            page = len(self.pages)
+            return [c for c in self.chunks if c.page == page][:k]
+
+    def _split(self, text):
+        words = text.split()
+        step = max(1, self.chunk_words - self.overlap)
+        return [" ".join(words[i:i + self.chunk_words]) for i in range(0, max(1, len(words) - self.overlap), step)]
+
+
+def gather_context(book, question, current_text=""):
+    """Book text for a question: the page in front of the reader first, then the top-k chunks from other pages"""
+    current_text = (current_text or "").strip()
+    if len(book) <= 1:
+        return current_text or "".join(book.pages)
+    sections = [f"[Current page] {current_text}"] if current_text else []
+    current_words = " ".join(current_text.split())  # chunks are whitespace-normalised
+    for c in book.search(question) or book.latest_page_chunks():
+        if c.text not in current_words:
+            sections.append(f"[Page {c.page}] {c.text}")
+    return "\n\n".join(sections)
 
 
 class BookDiscussionApp:
@@ -51,12 +1277,46 @@ class BookDiscussionApp:
         self.api_key = tk.StringVar()
         self.hf_api_key = tk.StringVar()
         self.captured_image = None
+        self.ocr_engine = LocalFirstOcrEngine()
+        self.result_cache = ResultCache()
         self.extracted_text = ""
         self.messages = []
+        self.active_reply = None
+        self.discussion_epoch = 0  # bumped by a new question or page; a reply from an older epoch is stale
+        self.jobs = JobScheduler(root)
+        self.context = ContextBuilder(summarizer=self.summarize_turns)
+        self.book = BookIndex()  # the embedder is attached by warm_up, it imports torch too
         self.camera = None
+        self.warm_camera = None
         self.is_camera_active = False
         
         self.create_api_key_screen()
+        self.root.after_idle(self.on_window_shown)
+    
+    def on_window_shown(self):
+        shown = time.monotonic() - STARTED_AT
+        Tracer.instance().record('startup.window', shown)
+        print(f"🪟 Window shown {shown:.2f}s after launch")
+        self.jobs.submit('warmup', self.warm_up)  # only now, so warming never competes with the first paint
+        
+    def warm_up(self, job):
+        """Runs while the API key screen is up, so the main screen doesn't wait on imports or the camera"""
+        if STARTUP_LAZY_IMPORTS:
+            print(f"🚀 Ready {warm_start():.2f}s after launch")
+        embedder = load_embedder()
+        if embedder and not self.book.attach_embedder(embedder):
+            print("⚠️ Pages were indexed before embeddings loaded, keeping keyword search only")
+        if STARTUP_WARM_CAMERA and not job.cancelled.is_set():
+            with trace('camera.open'):
+                camera = CameraStream(CAMERA_INDEX)
+                opened = camera.start()
+            if opened:
+                self.jobs.call_soon(self.adopt_warm_camera, camera)
+                
+    def adopt_warm_camera(self, camera):
+        if self.warm_camera or self.camera:
+            return camera.stop()
+        self.warm_camera = camera
     
     def _create_label(self, parent, text, font_size=11, bold=False, fg_key='text_primary', bg_key='bg_dark'):
         return tk.Label(parent, text=text, font=('Arial', font_size, 'bold' if bold else 'normal'),
@@ -87,15 +1347,15 @@ class BookDiscussionApp:
         self._create_entry(self.api_frame, self.api_key).pack(pady=5)
         
         # Hugging Face API Key
-        self._create_label(self.api_frame, "Hugging Face API Key (for OCR):", 11, True).pack(pady=(20, 5))
+        self._create_label(self.api_frame, "Hugging Face API Key (optional, OCR fallback):", 11, True).pack(pady=(20, 5))
         self._create_entry(self.api_frame, self.hf_api_key).pack(pady=5)
         
         # Info box
         info_frame = tk.Frame(self.api_frame, bg=self.colors['bg_card'])
         info_frame.pack(pady=20, padx=20, fill='x')
-        tk.Label(info_frame, text="API Keys Required:\n\n"
-                "1. Groq API Key: console.groq.com → Generate API key\n"
-                "2. Hugging Face: huggingface.co/settings/tokens → Create token",
+        tk.Label(info_frame, text="API Keys:\n\n"
+                "1. Groq API Key (required): console.groq.com → Generate API key\n"
+                "2. Hugging Face (optional, used when local OCR is unsure): huggingface.co/settings/tokens → Create token",
                 font=('Arial', 10), bg=self.colors['bg_card'], fg=self.colors['text_primary'],
                 justify='left').pack(padx=20, pady=15)
         
@@ -105,10 +1365,9 @@ class BookDiscussionApp:
     def start_app(self):
         if not self.api_key.get():
             return messagebox.showerror("Error", "Please enter your Groq API key")
-        if not self.hf_api_key.get():
-            return messagebox.showerror("Error", "Please enter your Hugging Face API key")
         
-        os.environ['HF_API_KEY'] = self.hf_api_key.get()
+        if self.hf_api_key.get():
+            os.environ['HF_API_KEY'] = self.hf_api_key.get()
         self.api_frame.destroy()
         self.create_main_screen()
         
@@ -119,7 +1378,9 @@ class BookDiscussionApp:
         top_bar.pack_propagate(False)
         
         self._create_label(top_bar, "📚 Book Discussion", 16, True, bg_key='bg_card').pack(side='left', padx=20, pady=15)
-        self._create_button(top_bar, "New Page", self.reset_app, padx=15, pady=5).pack(side='right', padx=20, pady=15)
+        self._create_button(top_bar, "New Book", self.new_book, padx=15, pady=5).pack(side='right', padx=(0, 20), pady=15)
+        self._create_button(top_bar, "New Page", self.reset_app, padx=15, pady=5).pack(side='right', padx=10, pady=15)
+        self._create_button(top_bar, "⏱ Stats", self.toggle_stats_overlay, bg_key='text_secondary', padx=10, pady=5).pack(side='right', pady=15)
         
         # Main content
         main_frame = tk.Frame(self.root, bg=self.colors['bg_dark'])
@@ -130,8 +1391,15 @@ class BookDiscussionApp:
         left_frame.pack(side='left', expand=True, fill='both', padx=5, pady=5)
         
         self._create_label(left_frame, "Capture Book Page", 14, True, bg_key='bg_card').pack(pady=10)
-        self.camera_canvas = tk.Canvas(left_frame, width=500, height=400, bg=self.colors['bg_darker'])
+        self.camera_canvas = tk.Canvas(left_frame, width=PREVIEW_SIZE[0], height=PREVIEW_SIZE[1], bg=self.colors['bg_darker'])
         self.camera_canvas.pack(pady=10, padx=10)
+        # Preview reuses one PhotoImage, one canvas item and two scratch arrays
+        self.preview_bgr = np.empty((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), dtype=np.uint8)
+        self.preview_rgb = np.empty_like(self.preview_bgr)
+        self.preview_photo = ImageTk.PhotoImage('RGB', PREVIEW_SIZE)
+        self.preview_item = None
+        self.preview_seq = None
+        self.preview_job = None
         
         btn_frame = tk.Frame(left_frame, bg=self.colors['bg_card'])
         btn_frame.pack(pady=10)
@@ -139,10 +1407,22 @@ class BookDiscussionApp:
         self.start_cam_btn.pack(side='left', padx=5)
         self.capture_btn = self._create_button(btn_frame, "📸 Capture", self.capture_image, bg_key='success', state='disabled')
         self.capture_btn.pack(side='left', padx=5)
+        self.auto_capture_on = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="🤖 Auto", variable=self.auto_capture_on, command=self.toggle_auto_capture,
+                       font=('Arial', 10), bg=self.colors['bg_card'], fg=self.colors['text_primary'],
+                       selectcolor=self.colors['bg_darker'], activebackground=self.colors['bg_card'],
+                       activeforeground=self.colors['text_primary']).pack(side='left', padx=5)
+        self.auto_capture = AutoCapture()
         
         self.status_label = self._create_label(left_frame, "Click 'Start Camera' to begin", 10, fg_key='text_secondary', bg_key='bg_card')
         self.status_label.pack(pady=5)
         
+        # Latency overlay, drawn over the camera view when toggled from the top bar
+        self.stats_label = tk.Label(left_frame, font=('Courier', 9), justify='left', anchor='nw',
+                                    bg=self.colors['bg_darker'], fg=self.colors['success'])
+        self.stats_visible = False
+        self.stats_job = None
+        
         # Right side - Discussion
         right_frame = tk.Frame(main_frame, bg=self.colors['bg_card'], relief='solid', borderwidth=1)
         right_frame.pack(side='right', expand=True, fill='both', padx=5, pady=5)
@@ -167,225 +1447,311 @@ class BookDiscussionApp:
         self.user_input.pack(side='left', expand=True, fill='x', padx=(0, 5))
         self.user_input.bind('<Return>', lambda e: self.send_message())
         self._create_button(input_frame, "Send", self.send_message, padx=20, pady=5).pack(side='right')
+        self.stop_btn = self._create_button(input_frame, "■ Stop", self.cancel_reply, bg_key='error', padx=10, pady=5, state='disabled')
+        self.stop_btn.pack(side='right', padx=(0, 5))
+        
+        # Warm the scene model while the user lines up a page
+        if not SceneModelManager.instance().is_loaded:
+            self.jobs.submit('warmup', lambda job: SceneModelManager.instance().acquire(), supersede=False)
         
     def start_camera(self):
         try:
-            self.camera = cv2.VideoCapture(0)
-            if not self.camera.isOpened():
-                return messagebox.showerror("Error", "Could not access camera")
+            self.camera, self.warm_camera = self.warm_camera, None
+            if self.camera is None:
+                self.camera = CameraStream(CAMERA_INDEX)
+                if not self.camera.start():
+                    self.camera = None
+                    return messagebox.showerror("Error", "Could not access camera")
             self.is_camera_active = True
+            self.preview_seq = None
             self.start_cam_btn.config(state='disabled')
             self.capture_btn.config(state='normal')
             self.status_label.config(text="Camera active - Position your book page")
+            self.toggle_auto_capture()
             self.update_camera_feed()
         except Exception as e:
             messagebox.showerror("Camera Error", str(e))
             
     def update_camera_feed(self):
+        self.preview_job = None
         if self.is_camera_active and self.camera:
-            ret, frame = self.camera.read()
-            if ret:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_resized = cv2.resize(frame_rgb, (500, 400))
-                imgtk = ImageTk.PhotoImage(image=Image.fromarray(frame_resized))
-                self.camera_canvas.create_image(0, 0, anchor='nw', image=imgtk)
-                self.camera_canvas.image = imgtk
-            self.root.after(10, self.update_camera_feed)
+            seq = self.camera.render(self.preview_bgr)
+            if seq is not None and seq != self.preview_seq:
+                self.preview_seq = seq
+                self.show_preview(self.preview_bgr)
+            self.preview_job = self.root.after(max(1, int(1000 / CAMERA_PREVIEW_FPS)), self.update_camera_feed)
+            
+    def show_preview(self, frame_bgr):
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self.preview_rgb)
+        self.preview_photo.paste(Image.fromarray(self.preview_rgb))
+        if self.preview_item is None:
+            self.preview_item = self.camera_canvas.create_image(0, 0, anchor='nw', image=self.preview_photo)
             
-    def capture_image(self):
+    def toggle_auto_capture(self):
+        if not self.camera:
+            return
+        self.auto_capture.reset()
+        if self.auto_capture_on.get():
+            self.camera.on_frame = self._auto_capture_frame
+            self.status_label.config(text="Auto-capture on - hold the page still")
+        else:
+            self.camera.on_frame = None
+            
+    def _auto_capture_frame(self, frame):
+        # Runs on the camera thread
+        page = self.auto_capture.feed(frame)
+        camera = self.camera
+        if page is not None and camera:
+            camera.on_frame = None
+            self.jobs.call_soon(self.capture_image, page)
+            
+    def capture_image(self, frame=None):
         if self.camera:
-            ret, frame = self.camera.read()
-            if ret:
+            if frame is None:
+                with trace('capture'):
+                    frame = self.camera.latest()
+            if frame is not None:
                 self.captured_image = frame
                 self.stop_camera()
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                imgtk = ImageTk.PhotoImage(image=Image.fromarray(cv2.resize(frame_rgb, (500, 400))))
-                self.camera_canvas.create_image(0, 0, anchor='nw', image=imgtk)
-                self.camera_canvas.image = imgtk
+                cv2.resize(frame, PREVIEW_SIZE, dst=self.preview_bgr, interpolation=cv2.INTER_AREA)
+                self.show_preview(self.preview_bgr)
                 self.status_label.config(text="Processing image...")
-                threading.Thread(target=self.perform_ocr, daemon=True).start()
+                self.jobs.submit('ocr', self.perform_ocr, frame)
                 
     def stop_camera(self):
         self.is_camera_active = False
+        if self.preview_job:
+            self.root.after_cancel(self.preview_job)
+            self.preview_job = None
         if self.camera:
-            self.camera.release()
+            self.camera.stop()
             self.camera = None
         self.start_cam_btn.config(state='normal')
         self.capture_btn.config(state='disabled')
         
-    def perform_ocr(self):
-        """Extract text using Hugging Face Vision-Language model"""
-        import base64
-        temp_path = "temp_ocr.jpg"
+    def perform_ocr(self, job, image):
+        """Extract text locally, falling back to the Hugging Face Vision-Language model"""
+        frame = None
         try:
-            cv2.imwrite(temp_path, self.captured_image)
-            self.root.after(0, lambda: self.status_label.config(text="Extracting text..."))
-            
-            hf_api_key = os.getenv('HF_API_KEY', '')
+            with trace('encode'):
+                frame = EncodedFrame(image)
+            job.post(lambda: self.status_label.config(text="Extracting text..."))
             
-            if not hf_api_key:
-                print("❌ HF_API_KEY not found")
-                self.root.after(0, lambda: self.status_label.config(text="API key missing", fg=self.colors['error']))
-                self.root.after(0, self.handle_ocr_failure)
+            result = recognize_frame(self.ocr_engine, self.result_cache, frame, job.cancelled)
+            if result.text.strip():
+                job.post(self.on_ocr_complete, result.text.strip(), frame)
                 return
             
-            # Convert image to base64
-            with open(temp_path, "rb") as f:
-                image_base64 = base64.b64encode(f.read()).decode("utf-8")
-            
-            print("🔄 Calling Hugging Face Vision API...")
-            
-            # Use the Inference API with chat completion format for VL models
-            api_url = "https://api-inference.huggingface.co/models/Qwen/Qwen2.5-VL-3B-Instruct"
-            headers = {
-                "Authorization": f"Bearer {hf_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "inputs": {
-                    "image": image_base64,
-                    "text": "Extract and return all the text you can read from this image. Only output the extracted text, nothing else."
-                }
-            }
-            
-            # Try up to 3 times (for model loading)
-            for attempt in range(3):
-                try:
-                    print(f"  Attempt {attempt + 1}/3...")
-                    resp = requests.post(api_url, headers=headers, json=payload, timeout=60)
-                    
-                    print(f"  Response status: {resp.status_code}")
-                    print(f"  Response: {resp.text[:500]}")
-                    
-                    if resp.status_code == 200:
-                        result = resp.json()
-                        # Parse response based on format
-                        if isinstance(result, list) and len(result) > 0:
-                            text = result[0].get("generated_text", "") or result[0].get("text", "")
-                        elif isinstance(result, dict):
-                            text = result.get("generated_text", "") or result.get("text", "") or result.get("output", "")
-                        else:
-                            text = str(result)
-                        
-                        if text.strip():
-                            print(f"✅ Success: {len(text)} chars extracted")
-                            self.extracted_text = text.strip()
-                            self.root.after(0, self.on_ocr_complete, text.strip())
-                            return
-                        else:
-                            print("  No text in response")
-                            
-                    elif resp.status_code == 503:
-                        print("  Model loading, waiting 10s...")
-                        time.sleep(10)
-                        continue
-                    else:
-                        print(f"  Error: {resp.text[:200]}")
-                        
-                except requests.exceptions.Timeout:
-                    print(f"  Timeout on attempt {attempt + 1}")
-                except Exception as e:
-                    print(f"  Error: {e}")
-            
             # If we get here, OCR failed
             print("❌ All OCR attempts failed")
-            self.root.after(0, lambda: self.status_label.config(text="OCR failed", fg=self.colors['error']))
-            self.root.after(0, self.handle_ocr_failure)
+            job.post(lambda: self.status_label.config(text="OCR failed", fg=self.colors['error']))
+            job.post(self.handle_ocr_failure, frame)
             
         except Exception as e:
             print(f"❌ OCR failed: {e}")
-            self.root.after(0, lambda: self.status_label.config(text="OCR failed", fg=self.colors['error']))
-            self.root.after(0, self.handle_ocr_failure)
-        finally:
-            try: os.path.exists(temp_path) and os.remove(temp_path)
-            except: pass
+            job.post(lambda: self.status_label.config(text="OCR failed", fg=self.colors['error']))
+            job.post(self.handle_ocr_failure, frame)
 
 
             
-    def handle_ocr_failure(self):
+    def handle_ocr_failure(self, frame):
         """Handle complete OCR failure"""
-        if messagebox.askyesno("OCR Failed", "Could not extract text.\n\nTry scene description instead?"):
-            threading.Thread(target=self.generate_scene_description, daemon=True).start()
+        if frame is not None and messagebox.askyesno("OCR Failed", "Could not extract text.\n\nTry scene description instead?"):
+            self.jobs.submit('scene', self.generate_scene_description, frame)
         else:
-            self.display_message("assistant", "I couldn't extract text. Try:\n1. Better lighting\n2. Steady camera\n3. Clear, focused text")
+            self.display_message("assistant", "I couldn't extract text. Try:\n1. Better lighting\n2. Steady camera\n3. Clear, focused text", chrome=True)
             
-    def on_ocr_complete(self, text):
+    def on_ocr_complete(self, text, frame):
         if text.strip():
+            self.extracted_text = text
+            epoch = self.book.epoch
+            self.jobs.submit('index', lambda job: self.book.add_page(text, epoch), supersede=False)
             self.status_label.config(text="Text extracted!", fg=self.colors['success'])
             preview = text[:300] + ("..." if len(text) > 300 else "")
-            self.display_message("assistant", f'I\'ve read the text:\n\n"{preview}"\n\nWhat would you like to discuss?')
+            self.display_message("assistant", f'I\'ve read the text:\n\n"{preview}"\n\nWhat would you like to discuss?', chrome=True)
         else:
             self.status_label.config(text="No text detected", fg=self.colors['error'])
             if messagebox.askyesno("No Text", "No text detected. Try scene description?"):
-                threading.Thread(target=self.generate_scene_description, daemon=True).start()
+                self.jobs.submit('scene', self.generate_scene_description, frame)
             else:
-                self.display_message("assistant", "I couldn't find text. Please try with better lighting.")
+                self.display_message("assistant", "I couldn't find text. Please try with better lighting.", chrome=True)
 
-    def generate_scene_description(self):
+    def generate_scene_description(self, job, frame):
         try:
-            temp_path = "temp_capture.jpg"
-            cv2.imwrite(temp_path, self.captured_image)
-            describer = SceneDescriber()
-            description = describer.describe_scene(temp_path)
-            self.extracted_text = f"Scene: {description}"
-            self.root.after(0, self.on_scene_complete, description)
+            scene = SceneModelManager.instance()
+            cached = self.result_cache.get(frame.phash, scene.model_id)
+            if cached and cached.caption:
+                print(f"⚡ Caption cache hit ({self.result_cache.stats()})")
+                description = cached.caption
+            else:
+                description = scene.caption(frame)
+                self.result_cache.put(frame.phash, scene.model_id, caption=description)
+            job.post(self.on_scene_complete, description)
         except Exception as e:
             print(f"❌ Scene description failed: {e}")
-            self.root.after(0, lambda: self.display_message("assistant", "Couldn't generate scene description."))
+            job.post(lambda: self.display_message("assistant", "Couldn't generate scene description.", chrome=True))
 
     def on_scene_complete(self, description):
-        self.display_message("assistant", f"I see: {description}.\n\nWould you like to discuss this?")
+        self.extracted_text = f"Scene: {description}"
+        self.display_message("assistant", f"I see: {description}.\n\nWould you like to discuss this?", chrome=True)
         self.status_label.config(text="Scene description complete!", fg=self.colors['success'])
             
     def send_message(self):
         user_msg = self.user_input.get().strip()
-        if not user_msg or not self.extracted_text: return
+        if not user_msg or not (self.extracted_text or len(self.book)): return
         self.user_input.delete(0, tk.END)
+        self.cancel_reply()
+        history = list(self.messages)
         self.display_message("user", user_msg)
-        threading.Thread(target=self.get_ai_response, args=(user_msg,), daemon=True).start()
+        self.discussion_epoch += 1
+        self.active_reply = self.jobs.submit('chat', self.get_ai_response, user_msg, history, self.discussion_epoch).cancelled
+        self.stop_btn.config(state='normal')
+        
+    def cancel_reply(self):
+        """Stop the in-flight answer; tokens already shown stay in the discussion"""
+        self.jobs.cancel('chat')
+        self.active_reply = None
+        self.stop_btn.config(state='disabled')
         
-    def get_ai_response(self, user_msg):
+    def get_ai_response(self, job, user_msg, history, epoch):
+        cancel = job.cancelled
         try:
-            conversation = [
-                {"role": "system", "content": "You are a thoughtful book discussion companion. Help users explore and understand captured text."},
-                {"role": "user", "content": f"Text from book:\n\n{self.extracted_text}\n\nLet's discuss."}
-            ] + [{"role": m["role"], "content": m["content"]} for m in self.messages] + [{"role": "user", "content": user_msg}]
+            conversation = self.context.build(self.retrieve_context(user_msg), history, user_msg)
+            headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key.get()}"}
+            payload = {"model": GROQ_CHAT_MODEL, "messages": conversation, "temperature": 0.7, "max_tokens": 1000}
             
-            response = requests.post("https://api.groq.com/openai/v1/chat/completions",
-                headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key.get()}"},
-                json={"model": "llama-3.1-8b-instant", "messages": conversation, "temperature": 0.7, "max_tokens": 1000})
-            
-            if response.status_code == 200:
-                ai_response = response.json()["choices"][0]["message"]["content"]
-                self.root.after(0, self.display_message, "assistant", ai_response)
+            if CHAT_STREAMING:
+                ai_response = self.stream_ai_response(job, headers, payload, epoch)
             else:
-                self.root.after(0, self.display_message, "assistant", f"API Error: {response.status_code}")
+                with trace('llm.complete', stream=False):
+                    response = HttpClient.instance().post(GROQ_CHAT_URL, headers=headers, json=payload, cancel=cancel)
+                if cancel.is_set():
+                    return
+                if response.status_code != 200:
+                    return job.post(self.finish_reply, cancel, "assistant", f"API Error: {response.status_code}", True)
+                ai_response = response.json()["choices"][0]["message"]["content"]
+                job.post(self.finish_reply, cancel, "assistant", ai_response)
+            
+            # Summarise turns that just left the window while the reader is reading the answer
+            if ai_response and not cancel.is_set():
+                turns = history + [{"role": "user", "content": user_msg}, {"role": "assistant", "content": ai_response}]
+                self.jobs.submit('summary', lambda job: self.context.compact(turns), supersede=False)
         except Exception as e:
-            self.root.after(0, self.display_message, "assistant", f"Connection error. Check API key and internet.")
+            job.post(self.finish_reply, cancel, "assistant", f"Connection error. Check API key and internet.", True)
             
-    def display_message(self, role, content):
-        self.messages.append({"role": role, "content": content})
+    def retrieve_context(self, user_msg):
+        """Top-k book chunks for the question instead of every page captured so far"""
+        return gather_context(self.book, user_msg, self.extracted_text)
+            
+    def summarize_turns(self, summary, turns):
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+        prompt = (f"Current summary:\n{summary or '(none)'}\n\nNew discussion turns:\n{transcript}\n\n"
+                  "Update the summary to cover the new turns in at most 120 words. Output only the summary.")
+        response = HttpClient.instance().post(GROQ_CHAT_URL,
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key.get()}"},
+            json={"model": GROQ_CHAT_MODEL, "messages": [{"role": "user", "content": prompt}], "temperature": 0.2, "max_tokens": 200})
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+            
+    def stream_ai_response(self, job, headers, payload, epoch):
+        """Stream the answer into the discussion pane, one UI update per STREAM_FLUSH_MS"""
+        try:
+            text = stream_chat(payload, headers, job.cancelled, on_start=lambda: job.post(self.begin_reply),
+                               on_chunk=lambda chunk: job.post(self.append_reply, chunk))
+        except requests.HTTPError as e:
+            job.post(self.finish_reply, job.cancelled, "assistant", f"API Error: {e.response.status_code}", True)
+            return None
+        # Not job.post: a reply the reader stopped still has to land in the history (end_reply checks the epoch)
+        self.jobs.call_soon(self.end_reply, job.cancelled, epoch, text)
+        return text
+        
+    def begin_reply(self):
+        self._insert_header("assistant")
+        self.messages_area.config(state='normal')
+        self.messages_area.insert(tk.END, "\n", 'content')
+        self.messages_area.config(state='disabled')
+        
+    def append_reply(self, chunk):
+        self.messages_area.config(state='normal')
+        self.messages_area.insert(tk.END, chunk, 'content')
+        self.messages_area.config(state='disabled')
+        self.messages_area.see(tk.END)
+        
+    def end_reply(self, cancel, epoch, content):
+        # A reply the reader stopped keeps what is on screen in the history; one cut off by
+        # a newer question or New Page is dropped, or it would land after the new turns
+        if content and epoch == self.discussion_epoch:
+            self.messages.append({"role": "assistant", "content": content})
+        self.release_reply(cancel)
+        
+    def release_reply(self, cancel):
+        if self.active_reply is cancel:
+            self.active_reply = None
+            self.stop_btn.config(state='disabled')
+            
+    def finish_reply(self, cancel, role, content, chrome=False):
+        self.display_message(role, content, chrome)
+        self.release_reply(cancel)
+            
+    def display_message(self, role, content, chrome=False):
+        """Show a message; chrome=True marks UI-only notices that are never sent to the model"""
+        self._insert_header(role)
+        self.messages.append({"role": role, "content": content, "chrome": chrome})
         self.messages_area.config(state='normal')
-        if len(self.messages) > 1: self.messages_area.insert(tk.END, "\n\n")
-        self.messages_area.insert(tk.END, f"{'You' if role == 'user' else 'AI'}: ", role)
         self.messages_area.insert(tk.END, f"\n{content}", 'content')
         self.messages_area.config(state='disabled')
         self.messages_area.see(tk.END)
         
+    def _insert_header(self, role):
+        self.messages_area.config(state='normal')
+        if self.messages_area.index('end-1c') != '1.0': self.messages_area.insert(tk.END, "\n\n")
+        self.messages_area.insert(tk.END, f"{'You' if role == 'user' else 'AI'}: ", role)
+        self.messages_area.config(state='disabled')
+        
+    def toggle_stats_overlay(self):
+        self.stats_visible = not self.stats_visible
+        if self.stats_visible:
+            self.stats_label.place(in_=self.camera_canvas, x=5, y=5, anchor='nw')
+            self.refresh_stats_overlay()
+        else:
+            self.stats_label.place_forget()
+            
+    def refresh_stats_overlay(self):
+        if self.stats_job:
+            self.root.after_cancel(self.stats_job)
+            self.stats_job = None
+        if self.stats_visible:
+            self.stats_label.config(text=Tracer.instance().summary())
+            self.stats_job = self.root.after(1000, self.refresh_stats_overlay)
+            
+    def new_book(self):
+        """Forget every captured page; New Page alone keeps them searchable"""
+        self.jobs.cancel('index')
+        self.book.clear()
+        self.reset_app()
+        
     def reset_app(self):
+        self.jobs.cancel('ocr', 'scene', 'summary')
+        self.cancel_reply()
+        self.discussion_epoch += 1
         self.stop_camera()
         self.captured_image = self.extracted_text = None
         self.messages = []
+        self.context.reset()
         self.messages_area.config(state='normal')
         self.messages_area.delete(1.0, tk.END)
         self.messages_area.config(state='disabled')
         self.camera_canvas.delete("all")
+        self.preview_item = None
         self.status_label.config(text="Click 'Start Camera' to begin", fg=self.colors['text_secondary'])
         self.user_input.delete(0, tk.END)
 
 
 if __name__ == "__main__":
+    if tk is None:
+        raise SystemExit("❌ The desktop app needs tkinter; use `python -m readingbuddy batch` on headless machines")
+    if not STARTUP_LAZY_IMPORTS:
+        print(f"🚀 Ready {warm_start():.2f}s after launch")
     root = tk.Tk()
     BookDiscussionApp(root)
     root.mainloop()
\ No newline at end of file
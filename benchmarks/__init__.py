@@ -0,0 +1 @@
+"""Offline benchmark harness with local Groq / Hugging Face stand-ins"""
@@ -0,0 +1,239 @@
+"""Offline benchmarks for the hot paths: python -m benchmarks [--baseline previous.json]"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from benchmarks import fixtures
+from benchmarks.mock_services import MockGroq, MockHuggingFace, ServiceBehaviour
+
+QUESTION = "What is this page about?"
+
+
+def ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def summarize(samples, prefix):
+    return {f"{prefix}_p50_ms": ms(np.percentile(samples, 50)), f"{prefix}_p95_ms": ms(np.percentile(samples, 95))}
+
+
+def bench_end_to_end(app, pages, scratch):
+    """Capture to answer through the app's own OCR + cache, retrieval, prompt building and SSE coalescing"""
+    engine, cache = app.LocalFirstOcrEngine(), app.ResultCache(os.path.join(scratch, "cache.sqlite3"))
+    context, book, history = app.ContextBuilder(), app.BookIndex(), []
+    headers = {"Content-Type": "application/json", "Authorization": "Bearer benchmark"}
+    ttft, total = [], []
+    for image in pages:
+        start, first = time.monotonic(), []
+        frame = app.EncodedFrame(image)
+        text = app.recognize_frame(engine, cache, frame).text.strip()
+        prompt = context.build(app.gather_context(book, QUESTION, text), history, QUESTION)
+        payload = {"model": app.GROQ_CHAT_MODEL, "messages": prompt, "temperature": 0.7, "max_tokens": 1000}
+        answer = app.stream_chat(payload, headers, on_chunk=lambda chunk: first.append(time.monotonic()))
+        ttft.append(first[0] - start)
+        total.append(time.monotonic() - start)
+        book.add_page(text)
+        history += [{"role": "user", "content": QUESTION}, {"role": "assistant", "content": answer}]
+    return {**summarize(ttft, 'capture_to_first_token'), **summarize(total, 'capture_to_answer')}
+
+
+def bench_ocr(app, pages, hf, workers):
+    results = {}
+    local = app.TesseractOcrEngine()
+    if local.available:
+        frames = [app.EncodedFrame(image) for image in pages]
+        start = time.monotonic()
+        for frame in frames:
+            local.recognize(frame)
+        results['local_pages_per_s'] = round(len(frames) / (time.monotonic() - start), 2)
+    else:
+        results['local_skipped'] = "tesseract not installed"
+
+    remote = app.RemoteVlOcrEngine()
+    frames = [app.EncodedFrame(image) for image in pages]
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(remote.recognize, frames))
+    results['remote_pages_per_s'] = round(len(frames) / (time.monotonic() - start), 2)
+
+    # One page through a cold endpoint: a "model loading" 503 and a 429, within the engine's attempts
+    hf.behaviour.requests, hf.behaviour.fail_503, hf.behaviour.fail_429 = 0, 1, 1
+    assert remote.attempts > 2, "the cold page needs a third attempt to succeed"
+    start = time.monotonic()
+    result = remote.recognize(frames[0])
+    elapsed = time.monotonic() - start
+    if not result.text:
+        raise RuntimeError(f"cold endpoint never recovered: {result.error}")
+    results['remote_cold_page_ms'] = ms(elapsed)
+    hf.behaviour.fail_503 = hf.behaviour.fail_429 = 0
+    return results
+
+
+def tiny_blip(directory):
+    """A randomly initialised BLIP a few hundred KB in size, exercising the real caption code path"""
+    from transformers import BertTokenizer, BlipConfig, BlipForConditionalGeneration, BlipImageProcessor, BlipProcessor
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(set(fixtures.LOREM.lower().replace(",", "").split()))
+    vocab_file = os.path.join(directory, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab))
+    processor = BlipProcessor(BlipImageProcessor(size={"height": 64, "width": 64}), BertTokenizer(vocab_file))
+    config = BlipConfig(
+        vision_config={"hidden_size": 32, "intermediate_size": 64, "num_hidden_layers": 2, "num_attention_heads": 4,
+                       "image_size": 64, "patch_size": 16},
+        text_config={"vocab_size": len(vocab), "hidden_size": 32, "intermediate_size": 64, "num_hidden_layers": 2,
+                     "num_attention_heads": 4, "max_position_embeddings": 64, "bos_token_id": 2, "sep_token_id": 3,
+                     "eos_token_id": 3, "pad_token_id": 0})
+    return processor, BlipForConditionalGeneration(config).eval()
+
+
+def bench_caption(app, pages):
+    try:
+        start = time.monotonic()
+        with tempfile.TemporaryDirectory() as directory:
+            processor, model = tiny_blip(directory)
+    except ImportError as e:
+        return {'skipped': f"transformers/torch not installed ({e.name})"}
+    describer = app.SceneDescriber.__new__(app.SceneDescriber)
+    describer.processor, describer.model = processor, model
+    load = time.monotonic() - start
+    frames = [app.EncodedFrame(image) for image in pages]
+    start = time.monotonic()
+    for frame in frames:
+        describer.caption(frame)
+    return {'tiny_model_load_ms': ms(load), 'captions_per_s': round(len(frames) / (time.monotonic() - start), 2)}
+
+
+def bench_camera(app, video_path, seconds):
+    """Capture thread fed from a video file, preview rendered into preallocated buffers like the UI does"""
+    from PIL import Image
+    camera = app.CameraStream(video_path)
+    if not camera.start():
+        return {'skipped': "OpenCV cannot decode the fixture video"}
+    width, height = app.PREVIEW_SIZE
+    bgr, rgb = np.empty((height, width, 3), np.uint8), np.empty((height, width, 3), np.uint8)
+    render, shown, last_seq = [], 0, None
+    start = last_new = time.monotonic()
+    try:
+        while time.monotonic() - start < seconds and time.monotonic() - last_new < 0.5:
+            tick = time.monotonic()
+            seq = camera.render(bgr)
+            if seq != last_seq:
+                cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=rgb)
+                Image.fromarray(rgb)
+                render.append(time.monotonic() - tick)
+                last_seq, last_new, shown = seq, time.monotonic(), shown + 1
+            else:
+                time.sleep(0.001)
+        elapsed = last_new - start
+    finally:
+        camera.stop()
+    return {'capture_fps': round(camera.seq / max(elapsed, 1e-6), 1), 'preview_fps': round(shown / max(elapsed, 1e-6), 1),
+            **summarize(render, 'preview_render')}
+
+
+def bench_startup(runs=3):
+    """Fresh interpreters importing app with lazy and eager heavy imports; the window itself needs a display"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import time, app; imported = time.monotonic() - app.STARTED_AT; "
+              "print(imported, imported if app.STARTUP_LAZY_IMPORTS else app.warm_start())")
+    results = {}
+    for mode, lazy in (('lazy', '1'), ('eager', '0')):
+        samples = []
+        for _ in range(runs):
+            out = subprocess.check_output([sys.executable, '-c', script], cwd=root, text=True,
+                                          env={**os.environ, 'STARTUP_LAZY_IMPORTS': lazy})
+            samples.append(float(out.split()[-1]))
+        results[f'{mode}_before_window_ms'] = ms(min(samples))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print metrics that moved more than threshold against the baseline; returns the regressions"""
+    regressions = []
+    for section, metrics in results.items():
+        for key, value in metrics.items():
+            old = baseline.get(section, {}).get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            lower_is_better = key.endswith('_ms')
+            worse = change > threshold if lower_is_better else change < -threshold
+            if worse or abs(change) > threshold:
+                print(f"{'❌' if worse else '✅'} {section}.{key}: {old} -> {value} ({change:+.0%})")
+            if worse:
+                regressions.append(f"{section}.{key}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change counted as a regression")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server seconds before first byte")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="mock Groq seconds between streamed tokens")
+    parser.add_argument("--ocr-workers", type=int, default=4)
+    parser.add_argument("--camera-seconds", type=float, default=3)
+    parser.add_argument("--only", nargs="+", choices=("end_to_end", "ocr", "caption", "camera", "startup"))
+    args = parser.parse_args(argv)
+
+    groq = MockGroq(ServiceBehaviour(latency=args.latency, token_delay=args.token_delay)).start()
+    hf = MockHuggingFace(ServiceBehaviour(latency=args.latency * 4, retry_after=0.1)).start()
+    os.environ.update(GROQ_CHAT_URL=groq.chat_url, HF_INFERENCE_URL=hf.inference_url, HF_API_KEY="benchmark",
+                      TRACE_FILE="")
+    import app  # after the environment points it at the mocks
+
+    pages = fixtures.page_images(args.pages)
+    selected = args.only or ("end_to_end", "ocr", "caption", "camera", "startup")
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        video = fixtures.write_video(os.path.join(scratch, "pages.avi"), pages[:5])
+        runs = {'end_to_end': lambda: bench_end_to_end(app, pages, scratch), 'ocr': lambda: bench_ocr(app, pages, hf, args.ocr_workers),
+                'caption': lambda: bench_caption(app, pages), 'camera': lambda: bench_camera(app, video, args.camera_seconds),
+                'startup': bench_startup}
+        for name in selected:
+            print(f"⏱️ {name}...", file=sys.stderr)
+            results[name] = runs[name]()
+    results['spans'] = {name: {'count': s['count'], 'p50_ms': ms(s['p50']), 'p95_ms': ms(s['p95'])}
+                        for name, s in app.Tracer.instance().stats().items()}
+    groq.stop()
+    hf.stop()
+
+    report = {'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(), 'pages': args.pages,
+                       'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+              'results': results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"📝 Results saved to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Deterministic synthetic page images (and a page-turn video) so runs are comparable across machines"""
+import os
+import random
+
+import cv2
+import numpy as np
+
+from benchmarks.mock_services import LOREM
+
+PAGE_SIZE = (1280, 960)  # camera-like frame, width x height
+
+
+def make_page(index, size=PAGE_SIZE):
+    """A slightly rotated light page with a few paragraphs of text on a dark desk"""
+    rng = random.Random(index)
+    width, height = size
+    image = np.full((height, width, 3), 45, dtype=np.uint8)
+    page = np.full((int(height * 0.85), int(width * 0.6), 3), 235, dtype=np.uint8)
+    words = LOREM.split()
+    y = 50
+    while y < page.shape[0] - 30:
+        rng.shuffle(words)
+        cv2.putText(page, " ".join(words[:7]), (30, y), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (20, 20, 20), 2, cv2.LINE_AA)
+        y += 34
+    ph, pw = page.shape[:2]
+    angle = rng.uniform(-4, 4)
+    matrix = cv2.getRotationMatrix2D((pw / 2, ph / 2), angle, 1.0)
+    matrix[:, 2] += ((width - pw) / 2, (height - ph) / 2)
+    mask = cv2.warpAffine(np.full((ph, pw), 255, np.uint8), matrix, (width, height))
+    warped = cv2.warpAffine(page, matrix, (width, height))
+    image[mask > 0] = warped[mask > 0]
+    return image
+
+
+def page_images(count, size=PAGE_SIZE):
+    return [make_page(i, size) for i in range(count)]
+
+
+def write_pages(directory, count, size=PAGE_SIZE):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"page_{i:03d}.png")
+        if not os.path.exists(path):
+            cv2.imwrite(path, make_page(i, size))
+        paths.append(path)
+    return paths
+
+
+def write_video(path, pages, frames_per_page=15, fps=30):
+    """MJPG clip holding each page still for a while, usable as a camera device by CameraStream"""
+    height, width = pages[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    for page in pages:
+        for _ in range(frames_per_page):
+            writer.write(page)
+    writer.release()
+    return path
@@ -0,0 +1,122 @@
+"""Local stand-ins for the Groq chat-completions API and the Hugging Face inference endpoint"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOREM = ("It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+         "foolishness, it was the epoch of belief, it was the epoch of incredulity.")
+
+
+class ServiceBehaviour:
+    """Latency and failure knobs shared by both mocks; counters are reset per benchmark"""
+
+    def __init__(self, latency=0.05, token_delay=0.005, tokens=60, fail_503=0, fail_429=0, retry_after=0.1):
+        self.latency = latency          # seconds before the first byte
+        self.token_delay = token_delay  # seconds between streamed tokens
+        self.tokens = tokens            # tokens per chat completion
+        self.fail_503 = fail_503        # first N requests answer 503 (model loading)
+        self.fail_429 = fail_429        # next N requests answer 429 (rate limited)
+        self.retry_after = retry_after
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def next_failure(self):
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+        if n <= self.fail_503:
+            return 503
+        if n <= self.fail_503 + self.fail_429:
+            return 429
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so the client's pooled sessions are exercised
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        behaviour = self.server.behaviour
+        time.sleep(behaviour.latency)
+        failure = behaviour.next_failure()
+        if failure == 503:  # like Hugging Face: the wait is only in the body
+            return self._json(503, {'error': 'Model is loading', 'estimated_time': behaviour.retry_after})
+        if failure == 429:
+            return self._json(429, {'error': 'Rate limited'}, {'Retry-After': f"{behaviour.retry_after:g}"})
+        self.server.handle_post(self, body)
+
+    def _json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, behaviour):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.behaviour = behaviour
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_post(self, handler, body):
+        raise NotImplementedError
+
+
+class MockGroq(MockServer):
+    """POST /openai/v1/chat/completions, plain JSON or `stream: true` SSE"""
+
+    @property
+    def chat_url(self):
+        return f"{self.base_url}/openai/v1/chat/completions"
+
+    def handle_post(self, handler, body):
+        words = (LOREM.split() * (self.behaviour.tokens // len(LOREM.split()) + 1))[:self.behaviour.tokens]
+        if not body.get('stream'):
+            return handler._json(200, {'choices': [{'message': {'role': 'assistant', 'content': " ".join(words)}}]})
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+        for i, word in enumerate(words):
+            delta = {'choices': [{'index': 0, 'delta': {'content': word if i == 0 else " " + word}}]}
+            handler._chunk(f"data: {json.dumps(delta)}\n\n".encode())
+            time.sleep(self.behaviour.token_delay)
+        handler._chunk(b"data: [DONE]\n\n")
+        handler._chunk(b"")
+
+
+class MockHuggingFace(MockServer):
+    """POST /models/<model>, answering like the hosted VL model"""
+
+    @property
+    def inference_url(self):
+        return f"{self.base_url}/models"
+
+    def handle_post(self, handler, body):
+        handler._json(200, [{'generated_text': LOREM}])
@@ -0,0 +1 @@
+"""Headless entry points for ReadingBuddy; the desktop app itself lives in app.py"""
@@ -0,0 +1,33 @@
+import argparse
+import os
+import sys
+
+from readingbuddy.batch import run_batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m readingbuddy", description="ReadingBuddy without the desktop UI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="OCR (and optionally caption) a folder of page scans or a video")
+    batch.add_argument("source", help="directory of images or a video file")
+    batch.add_argument("-o", "--output", default="pages.jsonl", help="JSONL results file, also the resume checkpoint")
+    batch.add_argument("--engine", choices=("auto", "local", "remote"), default="auto",
+                       help="auto: Tesseract first, Hugging Face only for low-confidence pages")
+    batch.add_argument("--caption", choices=("never", "fallback", "always"), default="fallback",
+                       help="caption pages with BLIP; fallback only when no text was found")
+    batch.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="workers for local OCR")
+    batch.add_argument("--caption-processes", type=int, default=1,
+                       help="workers for BLIP captions; each one loads its own copy of the model")
+    batch.add_argument("--threads", type=int, default=4, help="workers for remote OCR requests")
+    batch.add_argument("--every", type=int, default=30, help="video: sample every Nth frame")
+    batch.add_argument("--auto-capture", action="store_true", help="video: pick sharp, still frames instead of --every")
+    batch.add_argument("--no-resume", action="store_true", help="reprocess pages already in the output file")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        return run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
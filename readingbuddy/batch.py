@@ -0,0 +1,218 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import cv2
+
+import app
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+_local_engine = None
+
+
+def _init_worker():
+    """OCR pool initializer: one CPU thread per worker, the pool provides the parallelism"""
+    cv2.setNumThreads(1)
+
+
+def _load(source):
+    if isinstance(source, str):
+        image = cv2.imread(source)
+        if image is None:
+            raise ValueError(f"Unreadable image {source}")
+        return image
+    return source
+
+
+def local_job(item_id, source, keep_jpeg):
+    """Tesseract on one page; runs in the OCR process pool"""
+    global _local_engine
+    _local_engine = _local_engine or app.TesseractOcrEngine()
+    start = time.monotonic()
+    frame = app.EncodedFrame(_load(source))
+    result = _local_engine.recognize(frame)
+    record = {'id': item_id, 'text': result.text, 'confidence': result.confidence, 'engine': result.engine}
+    if result.error:
+        record['_error'] = result.error
+    if keep_jpeg:
+        record['_jpeg'] = frame.jpeg
+    record['seconds'] = round(time.monotonic() - start, 3)
+    return record
+
+
+def caption_job(record, jpeg):
+    """BLIP caption for one page; runs in the caption pool, so only its few processes load the model"""
+    start = time.monotonic()
+    record['caption'] = app.SceneModelManager.instance().caption(app.EncodedFrame.from_jpeg(jpeg))
+    record['seconds'] = round(record.get('seconds', 0) + time.monotonic() - start, 3)
+    return record
+
+
+def remote_job(engine, record, source=None, jpeg=None):
+    """Hosted VL OCR for one page; runs in the thread pool since it only waits on the network"""
+    start = time.monotonic()
+    frame = app.EncodedFrame.from_jpeg(jpeg) if jpeg else app.EncodedFrame(_load(source))
+    result = engine.recognize(frame)
+    if result.text.strip():
+        record.update(text=result.text, confidence=result.confidence, engine=result.engine)
+        record.pop('_error', None)
+    elif result.error and record['text'].strip():
+        record['error'] = result.error  # keep the low-confidence local reading, like LocalFirstOcrEngine
+        record.pop('_error', None)
+    elif result.error:
+        record['_error'] = result.error  # no engine read anything: leave the page for the next run
+    record['seconds'] = round(record.get('seconds', 0) + time.monotonic() - start, 3)
+    record['_jpeg'] = frame.jpeg  # kept in case the page still needs a caption
+    return record
+
+
+def iter_directory(path):
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                full = os.path.join(root, name)
+                yield os.path.relpath(full, path), full
+
+
+def iter_video(path, every, auto_capture):
+    capture = cv2.VideoCapture(path)
+    picker = app.AutoCapture() if auto_capture else None
+    index = 0
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if picker:
+                page = picker.feed(frame)
+                if page is not None:
+                    yield f"{os.path.basename(path)}#{index}", page
+            elif index % every == 0:
+                yield f"{os.path.basename(path)}#{index}", frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def count_items(source, every, auto_capture):
+    if os.path.isdir(source):
+        return sum(1 for _ in iter_directory(source))
+    if auto_capture:
+        return None
+    capture = cv2.VideoCapture(source)
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    return (frames + every - 1) // every if frames > 0 else None
+
+
+def load_checkpoint(path):
+    """Ids already written to the output file, so an interrupted run picks up where it stopped"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)['id'])
+            except (ValueError, KeyError):
+                pass  # a line cut short by the interruption
+    return done
+
+
+def run_batch(args):
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} not found", file=sys.stderr)
+        return 2
+    items = iter_directory(args.source) if os.path.isdir(args.source) else \
+        iter_video(args.source, max(1, args.every), args.auto_capture)
+    total = count_items(args.source, max(1, args.every), args.auto_capture)
+    done_ids = set() if args.no_resume else load_checkpoint(args.output)
+    if done_ids:
+        print(f"↩️ Resuming, {len(done_ids)} pages already in {args.output}", file=sys.stderr)
+
+    remote = app.RemoteVlOcrEngine()
+    min_confidence = app.OCR_MIN_CONFIDENCE
+    processes = ProcessPoolExecutor(max_workers=max(1, args.processes), initializer=_init_worker)
+    captions = ProcessPoolExecutor(max_workers=max(1, args.caption_processes)) if args.caption != 'never' else None
+    threads = ThreadPoolExecutor(max_workers=max(1, args.threads))
+    max_in_flight = max(1, args.processes) * 2 + max(1, args.threads)
+    pending = {}
+    written = failed = skipped = 0
+    start = time.monotonic()
+
+    def submit(item_id, source):
+        if args.engine == 'remote':
+            record = {'id': item_id, 'text': '', 'confidence': 0.0, 'engine': remote.name}
+            pending[threads.submit(remote_job, remote, record, source=source)] = (item_id, 'remote')
+        else:
+            keep_jpeg = args.engine == 'auto' or args.caption != 'never'
+            pending[processes.submit(local_job, item_id, source, keep_jpeg)] = (item_id, 'local')
+
+    def finish(record):
+        record.pop('_jpeg', None)
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def note(message):
+        # Clear the progress line first so the message gets a line of its own
+        print(f"\r\033[K{message}", file=sys.stderr)
+
+    def progress():
+        rate = written / max(time.monotonic() - start, 1e-6)
+        seen = written + failed + skipped
+        print(f"\r📄 [{seen}/{total if total is not None else '?'}] {rate:.2f} pages/s, {failed} failed",
+              end='', file=sys.stderr, flush=True)
+
+    with open(args.output, 'a', encoding='utf-8') as out:
+        try:
+            items = iter(items)
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_in_flight:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                    elif item[0] in done_ids:
+                        skipped += 1
+                    else:
+                        submit(*item)
+                if not pending:
+                    continue
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    item_id, stage = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        failed += 1
+                        note(f"❌ {item_id}: {e}")
+                        continue
+                    jpeg = record.pop('_jpeg', None)
+                    if jpeg and stage == 'local' and args.engine == 'auto' and record['confidence'] < min_confidence:
+                        pending[threads.submit(remote_job, remote, record, jpeg=jpeg)] = (item_id, 'remote')
+                    elif '_error' in record:
+                        failed += 1  # not written, so a resumed run tries the page again
+                        note(f"❌ {item_id}: {record['_error']}")
+                    elif jpeg and 'caption' not in record and (args.caption == 'always' or (
+                            args.caption == 'fallback' and not record['text'].strip())):
+                        pending[captions.submit(caption_job, record, jpeg)] = (item_id, 'caption')
+                    else:
+                        finish(record)
+                        written += 1
+                    progress()
+        except KeyboardInterrupt:
+            note("⏸️ Interrupted, rerun the same command to resume")
+            for future in pending:
+                future.cancel()
+            return 130
+        finally:
+            processes.shutdown(wait=False, cancel_futures=True)
+            threads.shutdown(wait=False, cancel_futures=True)
+            if captions:
+                captions.shutdown(wait=False, cancel_futures=True)
+
+    print(f"\n✅ {written} pages written to {args.output} ({skipped} resumed, {failed} failed)", file=sys.stderr)
+    return 1 if failed else 0
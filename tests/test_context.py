@@ -0,0 +1,38 @@
+import app
+
+
+def summarize(summary, turns):
+    return " ".join([summary] + [t["content"] for t in turns]).strip()
+
+
+def prompt_text(messages):
+    return "\n".join(m["content"] for m in messages)
+
+
+def test_every_prior_turn_is_verbatim_or_summarised():
+    context = app.ContextBuilder(summarizer=summarize, budget=4000, recent_turns=4, summary_batch=4)
+    history = []
+    for i in range(1, 12):
+        question = f"question {i:02d}"
+        prompt = prompt_text(context.build("page text", history, question))
+        for turn in context.dialogue(history):
+            assert turn["content"] in prompt or turn["content"] in context.summary
+        history += [{"role": "user", "content": question}, {"role": "assistant", "content": f"answer {i:02d}"}]
+        context.compact(history)
+
+
+def test_turns_waiting_for_compaction_stay_in_the_prompt():
+    context = app.ContextBuilder(summarizer=summarize, budget=4000, recent_turns=2, summary_batch=100)
+    history = []
+    for i in range(1, 6):
+        history += [{"role": "user", "content": f"question {i:02d}"}, {"role": "assistant", "content": f"answer {i:02d}"}]
+    context.compact(history)  # not enough turns for a batch yet, nothing is summarised
+    prompt = prompt_text(context.build("page text", history, "question 6"))
+    assert all(f"question {i:02d}" in prompt and f"answer {i:02d}" in prompt for i in range(1, 6))
+
+
+def test_budget_still_drops_the_oldest_unsummarised_turns():
+    context = app.ContextBuilder(budget=300, recent_turns=2)
+    history = [{"role": "user", "content": f"question {i:02d} " + "word " * 40} for i in range(10)]
+    prompt = prompt_text(context.build("", history, "next"))
+    assert "question 09" in prompt and "question 00" not in prompt
@@ -0,0 +1,54 @@
+import numpy as np
+import cv2
+
+import app
+from benchmarks import fixtures
+
+
+class FakeEngine(app.OcrEngine):
+    name = "tesseract>hf"
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def recognize(self, frame, cancel=None):
+        self.calls += 1
+        return self.result
+
+
+def distance(a, b):
+    return bin(int(a.phash, 16) ^ int(b.phash, 16)).count('1')
+
+
+def test_low_confidence_reading_is_not_served_from_cache():
+    cache, frame = app.ResultCache(':memory:'), app.EncodedFrame(fixtures.make_page(0))
+    weak = FakeEngine(app.OcrResult("g4rbled", 0.3, "tesseract"))
+    app.recognize_frame(weak, cache, frame)
+    good = FakeEngine(app.OcrResult("clean text", 1.0, "hf:model"))
+    assert app.recognize_frame(good, cache, frame).text == "clean text"
+    assert good.calls == 1
+
+
+def test_cache_hit_keeps_the_engine_that_read_the_text():
+    cache, frame = app.ResultCache(':memory:'), app.EncodedFrame(fixtures.make_page(0))
+    app.recognize_frame(FakeEngine(app.OcrResult("clean text", 0.9, "tesseract")), cache, frame)
+    engine = FakeEngine(None)
+    hit = app.recognize_frame(engine, cache, frame)
+    assert (hit.text, hit.engine, engine.calls) == ("clean text", "tesseract", 0)
+
+
+def test_phash_tolerates_noise_shift_and_lighting_but_not_another_page():
+    page = fixtures.make_page(0)
+    h, w = page.shape[:2]
+    rng = np.random.default_rng(0)
+    recaptures = [
+        np.clip(page + rng.normal(0, 3, page.shape), 0, 255).astype(np.uint8),
+        cv2.warpAffine(page, np.float32([[1, 0, 2], [0, 1, 2]]), (w, h), borderMode=cv2.BORDER_REPLICATE),
+        np.clip(page.astype(np.float32) * 0.8 + 20, 0, 255).astype(np.uint8),
+    ]
+    original = app.EncodedFrame(page)
+    for image in recaptures:
+        assert distance(original, app.EncodedFrame(image)) <= app.RESULT_CACHE_MAX_DISTANCE
+    for i in range(1, 6):
+        assert distance(original, app.EncodedFrame(fixtures.make_page(i))) > app.RESULT_CACHE_MAX_DISTANCE
@@ -0,0 +1,46 @@
+import app
+
+PAGE_1 = "Anna walked along the river to the old mill, where the miller sold her a sack of flour."
+PAGE_2 = "The letter from her brother never came.\nShe sat by the window all evening and cried."
+
+
+def make_book():
+    book = app.BookIndex()
+    book.add_page(PAGE_1)
+    book.add_page(PAGE_2)
+    return book
+
+
+def test_current_page_leads_even_when_already_indexed():
+    context = app.gather_context(make_book(), "Why is she sad?", PAGE_2)
+    assert context.startswith(f"[Current page] {PAGE_2}")
+
+
+def test_current_page_chunks_are_not_repeated():
+    context = app.gather_context(make_book(), "letter brother window", PAGE_2)
+    assert context.count("letter from her brother") == 1
+
+
+def test_scene_description_is_kept_next_to_book_chunks():
+    context = app.gather_context(make_book(), "Where did Anna buy flour?", "Scene: a cat on a sofa")
+    assert context.startswith("[Current page] Scene: a cat on a sofa")
+    assert "[Page 1]" in context
+
+
+def test_pages_indexed_for_a_cleared_book_are_dropped():
+    book = make_book()
+    epoch = book.epoch
+    book.clear()
+    assert book.add_page(PAGE_1, epoch) is None and len(book) == 0
+
+
+def test_clear_while_embedding_leaves_no_stale_vectors():
+    book = app.BookIndex()
+
+    def embedder(texts):
+        book.clear()  # New Book pressed while the index job is still embedding
+        return app.np.ones((len(texts), 4), dtype=app.np.float32)
+
+    book.attach_embedder(embedder)
+    assert book.add_page(PAGE_1) is None
+    assert book.chunks == [] and book.vectors is None